@@ -0,0 +1,140 @@
+"""
+Media stages of the video word remover that run in the Worker's process pool.
+
+This module only depends on the standard library and numpy, so spawned pool
+workers do not load the GUI or transcription stack. The stages log to the
+log file only and report back by return value.
+"""
+
+import logging
+import os
+import subprocess
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# Whisper expects 16 kHz mono audio
+SAMPLE_RATE = 16000
+
+# Containers that cannot hold AAC audio and the codec to use instead
+AUDIO_CODECS = {
+    ".mpeg": "mp2",
+    ".mpg": "mp2",
+    ".ogg": "libopus",
+    ".webm": "libopus",
+}
+
+
+def split_cores():
+    """
+    Split the cores this process may run on into two halves: one for
+    transcription and one for the ffmpeg stages. With a single core, both
+    share it.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cores = sorted(os.sched_getaffinity(0))
+    else:
+        cores = list(range(os.cpu_count() or 1))
+    half = max(1, len(cores) // 2)
+    return cores[:half], cores[half:] or cores
+
+
+def limit_media_process(cores):
+    """
+    Process pool initializer that keeps the ffmpeg stages off the
+    transcription cores. ffmpeg inherits the setting from the pool process.
+    On Linux the process is pinned to the given cores; macOS has no affinity
+    API, so the process runs at a lower priority instead.
+    """
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+    else:
+        os.nice(5)
+
+
+def extract_audio(video_path):
+    """
+    Decode the audio track with ffmpeg straight into memory as the 16 kHz
+    mono float32 waveform whisper consumes, without a temporary WAV file.
+    The waveform is written into a shared memory block so it is not pickled
+    back to the worker thread; returns the block's name and sample count.
+    The caller is responsible for unlinking the block.
+    """
+    logging.info(f"Extracting audio from {video_path}")
+    try:
+        result = subprocess.run(
+            [
+                "ffmpeg", "-nostdin", "-i", video_path,
+                "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"
+            ],
+            capture_output=True,
+            check=True
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(
+            f"Error extracting audio from video: {e.stderr.decode(errors='replace')}"
+        )
+    pcm = np.frombuffer(result.stdout, np.int16)
+
+    shm = SharedMemory(create=True, size=max(pcm.size * 4, 1))
+    audio = np.ndarray(pcm.shape, dtype=np.float32, buffer=shm.buf)
+    np.divide(pcm, 32768.0, out=audio, casting="unsafe")
+    del audio
+    shm.close()
+
+    logging.info(f"Decoded {pcm.size / SAMPLE_RATE:.1f}s of audio.")
+    return shm.name, pcm.size
+
+
+def mute_filter(segments):
+    """
+    Build an ffmpeg volume filter that silences audio during every
+    (start, end) segment, given in seconds.
+    """
+    ranges = "+".join(f"between(t,{start:.3f},{end:.3f})" for start, end in segments)
+    return f"volume=0:enable='{ranges}'"
+
+
+def stage_mute_and_merge(video_path, segments, output_video_path):
+    """
+    Mute the given segments and merge the result with the original video in a
+    single ffmpeg call. The video stream is copied as-is, so resolution,
+    quality and container format are preserved and only the muted audio is
+    encoded. Without segments, the original audio track is copied too.
+    Returns the path of the video that was processed.
+    """
+    _, ext = os.path.splitext(video_path)
+    ext = ext.lower()
+
+    # Ensure output path has the same extension
+    base_no_ext, _ = os.path.splitext(output_video_path)
+    output_video_path_correct_ext = base_no_ext + ext
+
+    if segments:
+        logging.info(f"Muting {len(segments)} segments of {video_path}")
+        audio_params = [
+            "-filter_complex", f"[0:a:0]{mute_filter(segments)}[aout]",
+            "-map", "0:v:0", "-map", "[aout]",
+            "-c:a", AUDIO_CODECS.get(ext, "aac"), "-b:a", "192k"
+        ]
+    else:
+        audio_params = ["-map", "0:v:0", "-map", "0:a:0", "-c:a", "copy"]
+
+    logging.info(f"Writing final video to: {output_video_path_correct_ext}")
+    try:
+        subprocess.run(
+            [
+                "ffmpeg", "-y", "-i", video_path,
+                *audio_params, "-c:v", "copy",
+                output_video_path_correct_ext
+            ],
+            check=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE
+        )
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(
+            f"Error merging audio with video: {e.stderr.decode(errors='replace')}"
+        )
+    logging.info("Merging complete.")
+    return video_path
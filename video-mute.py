@@ -19,15 +19,17 @@ Features:
     - Has a GUI to set input directory, output directory, and words file.
     - Provides a progress bar and logging.
     - Exports a text transcript for each processed video.
+    - Caches transcripts in ~/.cache/ai-video-muter so reruns skip transcription.
 
 Dependencies:
     - Python 3.x
     - pip install:
         PyQt6
-        moviepy==1.0.3
-        pydub
+        numpy
+        pyahocorasick (optional, speeds up matching large word lists)
         whisper-mps
         torch
+        faster-whisper (optional, used instead of whisper-mps when MLX cannot run on Metal)
     - ffmpeg (must be installed and accessible on PATH)
 
 Usage:
@@ -38,10 +40,24 @@ Usage:
     5. A transcript file (ending with `_transcript.txt`) will be saved alongside the output video.
 """
 
+import hashlib
+import json
 import os
 import sys
 import threading
 import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+from multiprocessing.shared_memory import SharedMemory
+
+from media_stages import (
+    SAMPLE_RATE,
+    extract_audio,
+    limit_media_process,
+    split_cores,
+    stage_mute_and_merge
+)
 
 from PyQt6.QtWidgets import (
     QApplication,
@@ -56,16 +72,54 @@ from PyQt6.QtWidgets import (
     QHBoxLayout,
     QMessageBox
 )
-from PyQt6.QtCore import Qt, QThread, pyqtSignal
-
-# From the whisper-mps repository
-from whisper_mps.whisper.transcribe import transcribe
-
-import torch
-device = torch.device("mps" if torch.backends.mps.is_available() else "cpu")
-
-from moviepy.editor import AudioFileClip, VideoFileClip, CompositeVideoClip
-from pydub import AudioSegment
+from PyQt6.QtCore import Qt, QThread, QTimer, pyqtSignal
+
+# Spawned pool workers re-run this script as __mp_main__, but they only run
+# media_stages functions, so they skip loading the transcription backends.
+LOAD_BACKENDS = __name__ != "__mp_main__"
+
+# Optional CTranslate2 backend, used when Metal is not available
+WhisperModel = None
+if LOAD_BACKENDS:
+    try:
+        from faster_whisper import BatchedInferencePipeline, WhisperModel
+    except ImportError:
+        pass
+
+# whisper-mps runs on MLX. It is used when MLX can run on Metal, or as a
+# CPU fallback when faster-whisper is not installed.
+mx = None
+if LOAD_BACKENDS:
+    try:
+        import mlx.core as mx
+    except ImportError:
+        pass
+USE_WHISPER_MPS = mx is not None and (mx.metal.is_available() or WhisperModel is None)
+
+if USE_WHISPER_MPS:
+    # From the whisper-mps repository
+    from whisper_mps.whisper.audio import (
+        N_FRAMES,
+        N_SAMPLES,
+        N_SAMPLES_PER_TOKEN,
+        log_mel_spectrogram,
+        pad_or_trim
+    )
+    from whisper_mps.whisper.decoding import DecodingOptions, decode
+    from whisper_mps.whisper.load_models import load_model
+    from whisper_mps.whisper.tokenizer import get_tokenizer
+    from whisper_mps.whisper.transcribe import ModelHolder
+
+    import mlx.nn as nn
+    import torch
+
+import numpy as np
+
+# Optional Aho-Corasick matcher; plain bytes substring search is used without it
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # Configure logging
 logging.basicConfig(
@@ -75,6 +129,70 @@ logging.basicConfig(
     level=logging.INFO
 )
 
+SUPPORTED_EXTENSIONS = frozenset({
+    ".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv",
+    ".mpeg", ".mpg", ".ogg", ".webm"
+})
+
+# Transcripts are cached here by audio content, so reruns with a different
+# word list skip transcription
+TRANSCRIPT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "ai-video-muter")
+
+# Number of 30 second windows encoded per whisper forward pass. Larger
+# batches run out of memory on MPS.
+BATCH_SIZE = 8
+
+
+
+def silent_mel_batch(batch_size, dtype):
+    """
+    Return a (batch_size, 3000, 80) log-mel batch of silence, used to warm up
+    the whisper encoder.
+    """
+    mel = pad_or_trim(
+        log_mel_spectrogram(np.zeros(N_SAMPLES, dtype=np.float32)),
+        N_FRAMES,
+        axis=-2
+    )
+    return mx.broadcast_to(mel, (batch_size, *mel.shape)).astype(dtype)
+
+
+def iter_video_files(directory):
+    """
+    Recursively yield supported video paths under directory. os.scandir reuses
+    the file type from the directory listing, so most entries need no stat().
+    Directories that cannot be read are logged and skipped, like os.walk does.
+    """
+    try:
+        entries = os.scandir(directory)
+    except OSError as e:
+        logging.warning(f"Skipping unreadable directory {directory}: {e}")
+        return
+
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from iter_video_files(entry.path)
+            elif (
+                entry.is_file()
+                and os.path.splitext(entry.name)[1].lower() in SUPPORTED_EXTENSIONS
+            ):
+                yield entry.path
+
+
+def merge_mute_intervals(intervals, gap=0.05):
+    """
+    Sort (start, end) intervals and merge those that overlap or are less than
+    gap seconds apart, so each muted stretch becomes a single interval.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
 
 class Worker(QThread):
     """
@@ -90,73 +208,123 @@ class Worker(QThread):
         self.input_dir = input_dir
         self.output_dir = output_dir
         self.words_file = words_file
+        self.model = None
+        self.fp16 = True
+        self.encode = None
+        self.pipeline = None
+        self.automaton = None
+        self.removal_bytes = []
+        self.vad_model = None
+        self.get_speech_timestamps = None
+
+        # Messages are buffered and emitted to the GUI at most 10 times a second
+        self.message_buffer = []
+        self.message_lock = threading.Lock()
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setInterval(100)
+        self.flush_timer.timeout.connect(self.flush_messages)
+        self.started.connect(self.flush_timer.start)
+        self.finished.connect(self.flush_timer.stop)
 
     def run(self):
         """
         Main workflow to process video files:
             1) Collect video files from the input directory
             2) Load the list of words/phrases to remove
-            3) For each video:
-                - Extract audio
-                - Transcribe (whisper-mps) and export transcript
-                - Identify segments that contain unwanted words
-                - Mute those segments
-                - Merge back into video
+            3) For each video, pipelined across a process pool:
+                - Decode audio into memory (pool)
+                - Transcribe (whisper-mps) and export transcript (this thread)
+                - Identify segments that contain unwanted words (this thread)
+                - Mute those segments and merge back into video with a
+                  single ffmpeg call (pool)
         """
         try:
             self.log_and_emit("Starting video processing workflow.")
             video_files = self.collect_video_files()
             if not video_files:
                 self.log_and_emit("No video files found in the selected directory.")
+                self.flush_messages()
                 self.done_signal.emit()
                 return
 
             # Load words to remove
-            removal_words = self.load_removal_words()
+            self.load_removal_words()
+
+            # Split the cores between transcription and the ffmpeg stages so
+            # CPU inference and ffmpeg do not oversubscribe them
+            asr_cores, media_cores = split_cores()
+
+            # Load the whisper model once for every video in this run
+            if USE_WHISPER_MPS:
+                torch.set_num_threads(len(asr_cores))
+                self.model = self.load_whisper_model()
+                self.encode = self.compile_encoder(self.model)
+                self.load_vad_model()
+            elif WhisperModel is not None:
+                self.pipeline = self.load_faster_whisper_model(cpu_threads=len(asr_cores))
+            else:
+                raise RuntimeError(
+                    "No transcription backend available: install whisper-mps "
+                    "(Apple Silicon) or faster-whisper."
+                )
 
             total_files = len(video_files)
             completed = 0
 
-            for video_path in video_files:
-                self.log_and_emit(f"Processing video: {video_path}")
-                rel_path = os.path.relpath(video_path, self.input_dir)
-                output_video_path = os.path.join(self.output_dir, rel_path)
-
-                # Create subdirectories in output path if needed
-                os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
-
-                # Extract audio
-                audio_path = self.extract_audio(video_path)
-
-                # Transcribe with whisper-mps, using the "base" model by default
-                transcription = self.transcribe_audio(audio_path)
-                # Export transcript as a simple .txt file
-                self.export_transcript(transcription, output_video_path)
-
-                # Identify timestamps to mute
-                timestamps_to_mute = self.identify_mute_segments(
-                    transcription, removal_words
-                )
-
-                # Mute those audio segments
-                if timestamps_to_mute:
-                    muted_audio_path = self.mute_audio_segments(
-                        audio_path, timestamps_to_mute
-                    )
-                else:
-                    # If no segments need muting, use original audio
-                    self.log_and_emit("No segments matched any removal words.")
-                    muted_audio_path = audio_path
-
-                # Merge muted audio with original video
-                self.merge_audio_with_video(video_path, muted_audio_path, output_video_path)
-
-                # Cleanup temp audio
-                self.cleanup_files(audio_path, muted_audio_path)
-
-                completed += 1
-                progress_percent = (completed / total_files) * 100
-                self.progress_signal.emit(progress_percent)
+            # Audio extraction and mute/merge of neighbouring files run in the
+            # pool while the whisper model transcribes on this thread. Workers
+            # are spawned rather than forked from this multi-threaded process,
+            # which also keeps them on the parent's shared memory tracker.
+            with ProcessPoolExecutor(
+                max_workers=len(media_cores),
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=limit_media_process,
+                initargs=(media_cores,)
+            ) as pool:
+                pending_videos = iter(video_files)
+                extractions = deque()
+                merges = set()
+
+                def submit_next_extraction():
+                    video_path = next(pending_videos, None)
+                    if video_path is not None:
+                        extractions.append(
+                            (video_path, pool.submit(extract_audio, video_path))
+                        )
+
+                try:
+                    # Keep one extraction ahead of the file being transcribed
+                    submit_next_extraction()
+                    while extractions:
+                        video_path, extraction = extractions[0]
+                        submit_next_extraction()
+
+                        self.log_and_emit(f"Processing video: {video_path}")
+                        rel_path = os.path.relpath(video_path, self.input_dir)
+                        output_video_path = os.path.join(self.output_dir, rel_path)
+
+                        # Create subdirectories in output path if needed
+                        os.makedirs(os.path.dirname(output_video_path), exist_ok=True)
+
+                        timestamps_to_mute = self.transcribe_shared_audio(
+                            *extraction.result(), output_video_path
+                        )
+                        extractions.popleft()
+                        merges.add(pool.submit(
+                            stage_mute_and_merge,
+                            video_path,
+                            timestamps_to_mute,
+                            output_video_path
+                        ))
+
+                        done, merges = wait(merges, timeout=0)
+                        completed = self.report_merged(done, completed, total_files)
+
+                    for merged in as_completed(merges):
+                        completed = self.report_merged({merged}, completed, total_files)
+                finally:
+                    # Free the audio of files that were extracted but not transcribed
+                    self.discard_extractions(extractions)
 
             # Finished processing
             self.log_and_emit("Processing completed for all videos.")
@@ -164,64 +332,373 @@ class Worker(QThread):
             logging.error(str(e))
             self.error_signal.emit(f"An error occurred: {e}")
 
+        self.flush_messages()
         self.done_signal.emit()
 
+    def transcribe_shared_audio(self, shm_name, n_samples, output_video_path):
+        """
+        Run stage_transcribe on the waveform left in shared memory by
+        extract_audio, then release the block.
+        """
+        shm = SharedMemory(name=shm_name)
+        try:
+            return self.stage_transcribe(
+                np.ndarray((n_samples,), dtype=np.float32, buffer=shm.buf),
+                output_video_path
+            )
+        finally:
+            try:
+                shm.close()
+            except BufferError:
+                # A traceback still references the array; unlinking is enough
+                pass
+            shm.unlink()
+
+    def discard_extractions(self, extractions):
+        """
+        Unlink the shared memory blocks of pending extractions. Blocks that
+        were already released, or extractions that failed, are skipped.
+        """
+        while extractions:
+            _, extraction = extractions.popleft()
+            try:
+                shm = SharedMemory(name=extraction.result()[0])
+            except Exception:
+                continue
+            shm.close()
+            shm.unlink()
+
+    def stage_transcribe(self, audio, output_video_path):
+        """
+        Transcribe the decoded audio, export the transcript and return the
+        timestamps to mute. Runs on this thread, which owns the whisper model.
+        """
+        # Reuse the transcript of identical audio from an earlier run
+        cache_path = self.transcript_cache_path(audio)
+        transcription = self.load_cached_transcript(cache_path)
+        if transcription is None:
+            # Transcribe using the "base" model by default
+            if self.pipeline is not None:
+                transcription = self.transcribe_audio_faster(audio)
+            else:
+                transcription = self.transcribe_audio_batched(audio)
+            self.save_cached_transcript(cache_path, transcription)
+        # Export transcript as a simple .txt file
+        self.export_transcript(transcription, output_video_path)
+
+        # Identify timestamps to mute
+        timestamps_to_mute = self.identify_mute_segments(transcription)
+        if not timestamps_to_mute:
+            self.log_and_emit("No segments matched any removal words.")
+        return timestamps_to_mute
+
+    def transcript_cache_path(self, audio):
+        """
+        Return the cache file for this audio, keyed by the SHA-256 of the
+        decoded 16 kHz PCM and the transcription backend that produced it.
+        """
+        # "-ts" keeps transcripts cached with one segment per VAD chunk from
+        # being reused
+        backend = "faster-whisper-ts" if self.pipeline is not None else "whisper-mps"
+        digest = hashlib.sha256(backend.encode("utf-8"))
+        digest.update(audio)
+        return os.path.join(TRANSCRIPT_CACHE_DIR, digest.hexdigest() + ".json")
+
+    def load_cached_transcript(self, cache_path):
+        """
+        Load a cached transcription, or return None if there is none.
+        """
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                transcription = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self.log_and_emit(f"Using cached transcript: {cache_path}")
+        return transcription
+
+    def save_cached_transcript(self, cache_path, transcription):
+        """
+        Write the transcription to the cache atomically, so an interrupted run
+        never leaves a partial file behind. Failures are logged, not raised.
+        """
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(TRANSCRIPT_CACHE_DIR, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(transcription, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            self.log_and_emit(f"Could not cache transcript {cache_path}: {e}")
+
+    def report_merged(self, merges, completed, total_files):
+        """
+        Emit progress for finished mute/merge futures and return the updated
+        count of completed files. Raises if any of them failed.
+        """
+        for merged in merges:
+            video_path = merged.result()
+            completed += 1
+            self.log_and_emit(f"Finished video: {video_path}")
+            self.progress_signal.emit((completed / total_files) * 100)
+        return completed
+
     def collect_video_files(self):
         """
         Collect all supported video paths from the input directory.
         """
-        supported_ext = (
-            ".mp4", ".mov", ".avi", ".mkv", ".flv", ".wmv",
-            ".mpeg", ".mpg", ".ogg", ".webm"
-        )
-        video_files = []
-        for root, _, files in os.walk(self.input_dir):
-            for f in files:
-                if f.lower().endswith(supported_ext):
-                    full_path = os.path.join(root, f)
-                    video_files.append(full_path)
-
+        video_files = list(iter_video_files(self.input_dir))
         self.log_and_emit(f"Found {len(video_files)} video files in {self.input_dir}.")
         return video_files
 
     def load_removal_words(self):
         """
-        Load words/phrases to remove from the specified file.
+        Load words/phrases to remove from the specified file and compile them
+        into an Aho-Corasick automaton so each segment is scanned in one pass.
+        Without pyahocorasick, the words are kept as UTF-8 bytes for substring
+        search instead.
         """
-        removal_words = []
-        with open(self.words_file, "r", encoding="utf-8") as wf:
-            removal_words = [line.strip().lower() for line in wf if line.strip()]
+        # Read and lowercase the whole file at once rather than line by line
+        with open(self.words_file, "rb") as wf:
+            text = wf.read().decode("utf-8").lower()
+        removal_words = [w for w in map(str.strip, text.splitlines()) if w]
+
+        if ahocorasick is not None and removal_words:
+            self.automaton = ahocorasick.Automaton()
+            for w in removal_words:
+                self.automaton.add_word(w, w)
+            self.automaton.make_automaton()
+        else:
+            self.automaton = None
+            self.removal_bytes = [w.encode("utf-8") for w in removal_words]
+
         self.log_and_emit(f"Loaded {len(removal_words)} removal words/phrases.")
         return removal_words
 
-    def extract_audio(self, video_path):
+    def load_whisper_model(self, model_name="base"):
         """
-        Extract audio from video using moviepy and save as temporary WAV file.
+        Load the whisper-mps model once in FP16, falling back to FP32 if any op
+        fails in half precision. The instance is registered with whisper-mps's
+        ModelHolder so later runs in the same process reuse it instead of
+        loading the checkpoint again.
         """
-        self.log_and_emit(f"Extracting audio from {video_path}")
-        video_clip = VideoFileClip(video_path)
-        audio_clip = video_clip.audio
-        audio_path = video_path + "_temp_audio.wav"
-        audio_clip.write_audiofile(audio_path, logger=None)
-        video_clip.close()
-        audio_clip.close()
-        self.log_and_emit(f"Audio extracted to {audio_path}")
-        return audio_path
+        if ModelHolder.model is not None and ModelHolder.model_name == model_name:
+            model = ModelHolder.model
+            self.fp16 = model.encoder._positional_embedding.dtype == mx.float16
+            return model
 
-    def transcribe_audio(self, audio_path):
+        self.log_and_emit(f"Loading whisper model: {model_name}")
+        try:
+            model = self.build_whisper_model(model_name, mx.float16)
+            self.fp16 = True
+        except Exception as e:
+            self.log_and_emit(f"FP16 whisper model failed ({e}); falling back to FP32.")
+            model = self.build_whisper_model(model_name, mx.float32)
+            self.fp16 = False
+
+        ModelHolder.model = model
+        ModelHolder.model_name = model_name
+        precision = "FP16" if self.fp16 else "FP32"
+        self.log_and_emit(f"Whisper model loaded ({precision}, int8 Linear layers).")
+        return model
+
+    def build_whisper_model(self, model_name, dtype):
         """
-        Transcribe audio using whisper-mps's transcribe function.
+        Load the model in the given dtype, quantize its Linear layers to int8
+        and run the encoder once on silence so unsupported ops fail here.
         """
-        self.log_and_emit(f"Transcribing audio: {audio_path}")
-        # Using the "base" model by default; you can adjust as needed
-        transcription = transcribe(
-            audio_path, 
-            model="base",
-            task="transcribe",
-            language="en"
-            )
+        model = load_model(model_name, dtype=dtype)
+        # The token embedding doubles as the output projection, so only the
+        # Linear layers are quantized.
+        nn.quantize(
+            model,
+            group_size=64,
+            bits=8,
+            class_predicate=lambda _, m: isinstance(m, nn.Linear)
+        )
+        mx.eval(model.parameters())
+
+        mx.eval(model.encoder(silent_mel_batch(1, dtype)))
+        return model
+
+    def compile_encoder(self, model):
+        """
+        Compile the encoder with mx.compile so its ops run as fused kernels,
+        warming it up on a full batch of silence so the first video does not
+        pay the compile cost. Falls back to the eager encoder on failure.
+        """
+        dtype = mx.float16 if self.fp16 else mx.float32
+        try:
+            encode = mx.compile(model.encoder)
+            mx.eval(encode(silent_mel_batch(BATCH_SIZE, dtype)))
+        except Exception as e:
+            self.log_and_emit(f"Could not compile whisper encoder ({e}); using eager mode.")
+            return model.encoder
+        self.log_and_emit("Whisper encoder compiled.")
+        return encode
+
+    def load_faster_whisper_model(self, model_name="base", cpu_threads=0):
+        """
+        Load the faster-whisper (CTranslate2) model with int8 weights, wrapped
+        in its batched pipeline. Used on machines without Metal, where it is
+        much faster than running whisper-mps on the CPU.
+        """
+        self.log_and_emit(f"Loading faster-whisper model: {model_name}")
+        model = WhisperModel(
+            model_name, device="auto", compute_type="int8", cpu_threads=cpu_threads
+        )
+        self.log_and_emit("faster-whisper model loaded (int8).")
+        return BatchedInferencePipeline(model=model)
+
+    def transcribe_audio_faster(self, audio):
+        """
+        Transcribe audio with the faster-whisper batched pipeline, which runs
+        its own VAD to skip silence.
+        """
+        self.log_and_emit("Transcribing audio with faster-whisper.")
+        segments, _ = self.pipeline.transcribe(
+            audio,
+            language="en",
+            beam_size=1,
+            batch_size=BATCH_SIZE,
+            vad_filter=True,
+            # The batched pipeline defaults to one segment per VAD chunk (up to
+            # 30 s); timestamps give the same short segments as whisper-mps
+            without_timestamps=False
+        )
+        segments = [
+            {"id": seg_id, "start": seg.start, "end": seg.end, "text": seg.text}
+            for seg_id, seg in enumerate(segments)
+        ]
         self.log_and_emit("Transcription complete.")
-        return transcription
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": "en"
+        }
+
+    def load_vad_model(self):
+        """
+        Load the Silero VAD model used to split audio into speech chunks.
+        """
+        if self.vad_model is not None:
+            return
+        self.log_and_emit("Loading Silero VAD model.")
+        self.vad_model, utils = torch.hub.load("snakers4/silero-vad", "silero_vad")
+        self.get_speech_timestamps = utils[0]
+
+    def collect_speech_chunks(self, audio):
+        """
+        Run VAD over the 16 kHz waveform and group the speech intervals into
+        chunks of at most 30 seconds, returned as (start, end) sample offsets.
+        Silero splits long speech at its quietest point so words are not cut.
+        """
+        speech_pad_ms = 30
+        speech = self.get_speech_timestamps(
+            torch.from_numpy(audio),
+            self.vad_model,
+            sampling_rate=SAMPLE_RATE,
+            speech_pad_ms=speech_pad_ms,
+            # Leave room for the padding added on both sides of each interval
+            max_speech_duration_s=N_SAMPLES / SAMPLE_RATE - 2 * speech_pad_ms / 1000
+        )
+        chunks = []
+        for interval in speech:
+            start, end = interval["start"], interval["end"]
+            if chunks and end - chunks[-1][0] <= N_SAMPLES:
+                chunks[-1] = (chunks[-1][0], end)
+                continue
+            # Fallback in case VAD still returns speech longer than one window
+            while end - start > N_SAMPLES:
+                chunks.append((start, start + N_SAMPLES))
+                start += N_SAMPLES
+            chunks.append((start, end))
+        return chunks
+
+    def transcribe_audio_batched(self, audio, batch_size=BATCH_SIZE):
+        """
+        Transcribe audio by splitting it into VAD speech chunks and running the
+        whisper encoder and decoder on batches of chunks at once.
+        """
+        self.log_and_emit("Transcribing audio.")
+        chunks = self.collect_speech_chunks(audio)
+        self.log_and_emit(f"Found {len(chunks)} speech chunks.")
+
+        tokenizer = get_tokenizer(
+            self.model.is_multilingual,
+            num_languages=self.model.num_languages,
+            language="en",
+            task="transcribe"
+        )
+        options = DecodingOptions(task="transcribe", language="en", fp16=self.fp16)
+        dtype = mx.float16 if self.fp16 else mx.float32
+
+        segments = []
+        for i in range(0, len(chunks), batch_size):
+            batch = chunks[i:i + batch_size]
+            mel = mx.stack([
+                pad_or_trim(
+                    log_mel_spectrogram(audio[start:end], padding=N_SAMPLES),
+                    N_FRAMES,
+                    axis=-2
+                )
+                for start, end in batch
+            ]).astype(dtype)
+            audio_features = self.encode(mel)
+            results = decode(self.model, audio_features, options)
+
+            for (start, end), result in zip(batch, results):
+                segments.extend(self.tokens_to_segments(
+                    result.tokens,
+                    tokenizer,
+                    start / SAMPLE_RATE,
+                    end / SAMPLE_RATE
+                ))
+
+        for seg_id, seg in enumerate(segments):
+            seg["id"] = seg_id
+
+        self.log_and_emit("Transcription complete.")
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": "en"
+        }
+
+    def tokens_to_segments(self, tokens, tokenizer, chunk_start, chunk_end):
+        """
+        Split a decoded token sequence into segments at its timestamp tokens,
+        shifting the times by the chunk's offset in the original audio.
+        """
+        time_precision = N_SAMPLES_PER_TOKEN / SAMPLE_RATE
+        segments = []
+        seg_start = None
+        text_tokens = []
+
+        for token in tokens:
+            if token < tokenizer.timestamp_begin:
+                text_tokens.append(token)
+                continue
+            timestamp = chunk_start + (token - tokenizer.timestamp_begin) * time_precision
+            if seg_start is None:
+                seg_start = timestamp
+                continue
+            if text_tokens:
+                segments.append({
+                    "start": seg_start,
+                    "end": timestamp,
+                    "text": tokenizer.decode(text_tokens)
+                })
+            seg_start = None
+            text_tokens = []
+
+        # Trailing text without a closing timestamp runs to the end of the chunk
+        if text_tokens:
+            segments.append({
+                "start": chunk_start if seg_start is None else seg_start,
+                "end": chunk_end,
+                "text": tokenizer.decode(text_tokens)
+            })
+        return segments
 
     def export_transcript(self, transcription, output_video_path):
         """
@@ -237,118 +714,64 @@ class Worker(QThread):
 
         self.log_and_emit(f"Transcript saved: {transcript_path}")
 
-    def identify_mute_segments(self, transcription, removal_words):
+    def identify_mute_segments(self, transcription):
         """
-        Identify segments to mute by comparing each segment text against removal words.
+        Identify segments to mute by scanning each segment text for removal words.
         """
         self.log_and_emit("Identifying segments to mute based on removal words.")
         segments = transcription.get('segments', [])
         timestamps_to_mute = []
 
         for seg in segments:
-            segment_text = seg.get('text', "").lower()
+            w = self.find_removal_word(seg.get('text', "").lower())
+            if w is None:
+                continue
             start_time = seg.get('start', 0.0)
             end_time = seg.get('end', 0.0)
-            for w in removal_words:
-                if w in segment_text:
-                    # Log the matched word
-                    self.log_and_emit(
-                        f"Found word '{w}' in segment [{start_time}, {end_time}]"
-                    )
-                    timestamps_to_mute.append((start_time, end_time))
-                    break  # no need to check other words for this segment
+            # Log the matched word
+            self.log_and_emit(
+                f"Found word '{w}' in segment [{start_time}, {end_time}]"
+            )
+            timestamps_to_mute.append((start_time, end_time))
 
         self.log_and_emit(
             f"Found {len(timestamps_to_mute)} segments matching removal words."
         )
-        return timestamps_to_mute
+        return merge_mute_intervals(timestamps_to_mute)
 
-    def mute_audio_segments(self, audio_path, segments):
+    def find_removal_word(self, segment_text):
         """
-        Mute the segments in the audio by applying heavy negative gain via pydub.
+        Return the first removal word found in the lowercased segment text,
+        or None if there is no match.
         """
-        self.log_and_emit("Muting matched segments in audio.")
-        original_audio = AudioSegment.from_file(audio_path, format="wav")
+        if self.automaton is not None:
+            for _, w in self.automaton.iter(segment_text):
+                return w
+            return None
 
-        for start_time, end_time in segments:
-            start_ms = int(start_time * 1000)
-            end_ms = int(end_time * 1000)
-            segment_to_mute = original_audio[start_ms:end_ms].apply_gain(-100.0)
-            original_audio = (
-                original_audio[:start_ms] + segment_to_mute + original_audio[end_ms:]
-            )
+        segment_bytes = segment_text.encode("utf-8")
+        for w in self.removal_bytes:
+            if w in segment_bytes:
+                return w.decode("utf-8")
+        return None
 
-        muted_audio_path = audio_path.replace("_temp_audio.wav", "_temp_muted.wav")
-        original_audio.export(muted_audio_path, format="wav")
-        self.log_and_emit(f"Exported muted audio to {muted_audio_path}")
-        return muted_audio_path
-
-    def merge_audio_with_video(self, video_path, audio_path, output_video_path):
-        """
-        Merge the muted audio with the original video track, preserving resolution
-        and container format. Compatible with MoviePy 1.0.x
-        """
-        self.log_and_emit(
-            f"Merging muted audio with original video.\n"
-            f"Video: {video_path}\nMuted audio: {audio_path}"
-        )
-        try:
-            _, ext = os.path.splitext(video_path)
-            ext = ext.lower()
-
-            video_clip = VideoFileClip(video_path)
-            new_audio_clip = AudioFileClip(audio_path)
-
-            # MoviePy 1.0.x doesn't have set_audio() or an 'audio=' argument in CompositeVideoClip
-            # so we do it step-by-step:
-            final_clip = CompositeVideoClip([video_clip.set_duration(video_clip.duration)])
-            final_clip.audio = new_audio_clip
-
-            # Ensure output path has the same extension
-            base_no_ext, _ = os.path.splitext(output_video_path)
-            output_video_path_correct_ext = base_no_ext + ext
-
-            self.log_and_emit(f"Writing final video to: {output_video_path_correct_ext}")
-            final_clip.write_videofile(
-                output_video_path_correct_ext,
-                codec="h264_videotoolbox",
-                audio_codec="aac",
-                ffmpeg_params=["-q:v", "50"],
-                logger=None
-            )
-
-            video_clip.close()
-            new_audio_clip.close()
-            final_clip.close()
-            self.log_and_emit("Merging complete.")
-        except Exception as e:
-            raise RuntimeError(f"Error merging audio with video: {e}")
-
-    def cleanup_files(self, audio_path, muted_audio_path):
+    def log_and_emit(self, message):
         """
-        Remove temporary audio files to keep things clean.
+        Log a message to file and queue it for the next emit to the GUI thread.
         """
-        self.log_and_emit("Cleaning up temporary audio files.")
-        if os.path.exists(audio_path):
-            try:
-                os.remove(audio_path)
-                self.log_and_emit(f"Deleted temp file: {audio_path}")
-            except Exception as e:
-                self.log_and_emit(f"Error deleting temp file {audio_path}: {e}")
-
-        if muted_audio_path != audio_path and os.path.exists(muted_audio_path):
-            try:
-                os.remove(muted_audio_path)
-                self.log_and_emit(f"Deleted temp file: {muted_audio_path}")
-            except Exception as e:
-                self.log_and_emit(f"Error deleting temp file {muted_audio_path}: {e}")
+        logging.info(message)
+        with self.message_lock:
+            self.message_buffer.append(message)
 
-    def log_and_emit(self, message):
+    def flush_messages(self):
         """
-        Log a message to file and emit it to the GUI thread.
+        Emit all queued messages to the GUI thread as a single message.
+        Called by the flush timer and once more before the worker finishes.
         """
-        logging.info(message)
-        self.message_signal.emit(message)
+        with self.message_lock:
+            messages, self.message_buffer = self.message_buffer, []
+        if messages:
+            self.message_signal.emit("\n".join(messages))
 
 
 class VideoWordRemoverGUI(QMainWindow):